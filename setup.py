@@ -1,3 +1,4 @@
+import os
 import re
 from setuptools import setup, find_packages
 
@@ -7,6 +8,15 @@ with open("README.md", "r", encoding="utf-8") as f:
 with open("tokentally/_version.py", "r", encoding="utf-8") as f:
     version = re.search(r'__version__ = "([^"]+)"', f.read()).group(1)
 
+# Set TOKENTALLY_MYPYC=1 to compile the hot modules to C extensions with mypyc.
+# mypy and httpx must then be installed in the build environment. The
+# pure-Python package is used otherwise.
+ext_modules = []
+if os.environ.get("TOKENTALLY_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["tokentally/types.py", "tokentally/client.py"])
+
 setup(
     name="tokentally",
     version=version,
@@ -17,6 +27,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/tokentally/tokentally-python",
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -35,6 +46,12 @@ setup(
         "httpx>=0.24.0",
     ],
     extras_require={
+        "orjson": [
+            "orjson>=3.0.0",
+        ],
+        "http2": [
+            "httpx[http2]>=0.24.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.21.0",
@@ -0,0 +1,16 @@
+import pytest
+import respx
+
+import tokentally.client
+from tokentally import TokenTally
+
+
+@pytest.fixture
+def api():
+    with respx.mock(base_url=TokenTally.DEFAULT_BASE_URL, assert_all_called=False) as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(tokentally.client, "_RETRY_BACKOFF", 0.0)
@@ -0,0 +1,120 @@
+import json
+
+import httpx
+import pytest
+
+from tokentally import AsyncTokenTally, UsageData
+
+API_KEY = "tt_test"
+
+USAGE_OK = {"success": True, "record_id": "rec_1", "cost_usd": 0.01}
+
+
+@pytest.mark.asyncio
+async def test_track_returns_response(api):
+    route = api.post("/api/usage").respond(200, json=USAGE_OK)
+
+    tt = AsyncTokenTally(API_KEY)
+    response = await tt.track(tokens_in=10, tokens_out=20, model="m")
+    await tt.aclose()
+
+    assert response.record_id == "rec_1"
+    body = json.loads(route.calls[0].request.content)
+    assert (body["tokens_in"], body["tokens_out"], body["model"]) == (10, 20, "m")
+
+
+@pytest.mark.asyncio
+async def test_track_usage_sends_on_exit(api):
+    route = api.post("/api/usage").respond(200, json=USAGE_OK)
+
+    tt = AsyncTokenTally(API_KEY)
+    async with tt.track_usage(model="m", metadata={"feature": "chat"}) as ctx:
+        assert route.call_count == 0
+        ctx.set_usage(tokens_in=10, tokens_out=20)
+    await tt.aclose()
+
+    assert ctx.response.record_id == "rec_1"
+    body = json.loads(route.calls[0].request.content)
+    assert body["metadata"] == {"feature": "chat"}
+    assert body["runtime_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_track_usage_without_usage_sends_nothing(api):
+    route = api.post("/api/usage")
+
+    tt = AsyncTokenTally(API_KEY)
+    async with tt.track_usage(model="m") as ctx:
+        pass
+    await tt.aclose()
+
+    assert ctx.response is None
+    assert route.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_track_batch_sends_one_request(api):
+    results = [dict(USAGE_OK, record_id="rec_a"), dict(USAGE_OK, record_id="rec_b")]
+    route = api.post("/api/usage/batch").respond(200, json={"results": results})
+
+    tt = AsyncTokenTally(API_KEY)
+    responses = await tt.track_batch([UsageData(1, 2, "a"), UsageData(3, 4, "b")])
+    assert await tt.track_batch([]) == []
+    await tt.aclose()
+
+    assert [r.record_id for r in responses] == ["rec_a", "rec_b"]
+    assert route.call_count == 1
+    usages = json.loads(route.calls[0].request.content)["usages"]
+    assert [u["model"] for u in usages] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_retry_reuses_idempotency_key(api):
+    route = api.post("/api/usage").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json=USAGE_OK)]
+    )
+
+    tt = AsyncTokenTally(API_KEY)
+    response = await tt.track(tokens_in=10, tokens_out=20, model="m")
+    await tt.aclose()
+
+    assert response.record_id == "rec_1"
+    keys = [call.request.headers["Idempotency-Key"] for call in route.calls]
+    assert len(keys) == 2
+    assert keys[0] == keys[1]
+
+
+@pytest.mark.asyncio
+async def test_track_usage_data_sends_every_call(api):
+    route = api.post("/api/usage").respond(200, json=USAGE_OK)
+    usage = UsageData(10, 20, "m")
+
+    tt = AsyncTokenTally(API_KEY)
+    await tt.track_usage_data(usage)
+    usage.tokens_in = 999
+    await tt.track_usage_data(usage)
+    await tt.aclose()
+
+    assert route.call_count == 2
+    assert json.loads(route.calls[1].request.content)["tokens_in"] == 999
+    keys = {call.request.headers["Idempotency-Key"] for call in route.calls}
+    assert len(keys) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_context_manager_closes(api):
+    async with AsyncTokenTally(API_KEY) as tt:
+        pass
+
+    assert tt._client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_zero_sends_nothing(api):
+    route = api.post("/api/usage")
+
+    async with AsyncTokenTally(API_KEY, sample_rate=0.0) as tt:
+        response = await tt.track(tokens_in=1, tokens_out=2, model="m")
+
+    assert response.record_id == ""
+    assert route.call_count == 0
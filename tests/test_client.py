@@ -0,0 +1,667 @@
+import gc
+import json
+import threading
+import time
+import weakref
+
+import httpx
+import pytest
+
+import tokentally.client
+from tokentally import (
+    AuthenticationError,
+    BufferedTokenTally,
+    RateLimitError,
+    TokenTally,
+    UsageData,
+    estimate_cost,
+    get_default_client,
+    prices,
+)
+from tokentally._spool import DiskSpool
+
+API_KEY = "tt_test"
+
+USAGE_OK = {"success": True, "record_id": "rec_1", "cost_usd": 0.01}
+
+
+# Classes compiled with mypyc don't support weak references.
+requires_weakrefs = pytest.mark.skipif(
+    not hasattr(TokenTally, "__weakref__"), reason="compiled client classes"
+)
+
+
+def batch_ok(count):
+    return {"results": [dict(USAGE_OK, record_id=f"rec_{i}") for i in range(count)]}
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def held_responses():
+    """Return a respx side effect that blocks until released, and its events."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def hold(request):
+        started.set()
+        release.wait(5)
+        return httpx.Response(200, json=batch_ok(1))
+
+    return started, release, hold
+
+
+def test_track_batch_sends_one_request(api):
+    route = api.post("/api/usage/batch").respond(200, json=batch_ok(2))
+
+    tt = TokenTally(API_KEY)
+    responses = tt.track_batch([UsageData(1, 2, "a"), UsageData(3, 4, "b")])
+
+    assert [r.record_id for r in responses] == ["rec_0", "rec_1"]
+    assert route.call_count == 1
+    usages = json.loads(route.calls[0].request.content)["usages"]
+    assert [u["model"] for u in usages] == ["a", "b"]
+    assert all("timestamp" in u for u in usages)
+
+
+def test_track_batch_of_nothing_sends_nothing(api):
+    route = api.post("/api/usage/batch")
+
+    assert TokenTally(API_KEY).track_batch([]) == []
+    assert route.call_count == 0
+
+
+def test_client_uses_pool_limits_and_environment_proxies(monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.local:3128")
+
+    with TokenTally(API_KEY, max_connections=7, max_keepalive_connections=3) as tt:
+        options = tt._client_options()
+        assert "transport" not in options
+        limits = options["limits"]
+        assert (limits.max_connections, limits.max_keepalive_connections) == (7, 3)
+        assert tt._client._mounts
+
+
+def test_batch_content_matches_json_encoding():
+    usages = [UsageData(1, 2, "a", metadata={"k": "v"}), UsageData(3, 4, "b", credits=5)]
+    records = [TokenTally._encode(u) for u in usages]
+
+    content = TokenTally._batch_content(records)
+
+    assert json.loads(content) == {"usages": [u.to_dict() for u in usages]}
+    assert TokenTally._batch_content([records[0]]) == b'{"usages":[' + records[0] + b"]}"
+    assert json.loads(TokenTally._batch_content([])) == {"usages": []}
+
+
+def test_retry_reuses_idempotency_key(api):
+    route = api.post("/api/usage").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json=USAGE_OK)]
+    )
+
+    response = TokenTally(API_KEY).track(tokens_in=10, tokens_out=20, model="m")
+
+    assert response.record_id == "rec_1"
+    assert route.call_count == 2
+    keys = [call.request.headers["Idempotency-Key"] for call in route.calls]
+    assert keys[0] == keys[1]
+
+
+def test_retries_exhausted_raises(api):
+    route = api.post("/api/usage").respond(503)
+
+    with pytest.raises(tokentally.client.TokenTallyError):
+        TokenTally(API_KEY, max_retries=1).track(tokens_in=10, tokens_out=20, model="m")
+
+    assert route.call_count == 2
+
+
+def test_client_errors_are_not_retried(api):
+    route = api.post("/api/usage").respond(400)
+
+    with pytest.raises(tokentally.client.TokenTallyError):
+        TokenTally(API_KEY).track(tokens_in=10, tokens_out=20, model="m")
+
+    assert route.call_count == 1
+
+
+def test_unauthorized_raises_authentication_error(api):
+    route = api.post("/api/usage").respond(401)
+
+    with TokenTally(API_KEY) as tt:
+        with pytest.raises(AuthenticationError):
+            tt.track(tokens_in=10, tokens_out=20, model="m")
+
+    assert route.call_count == 1
+
+
+def test_rate_limit_raises_with_server_message(api):
+    route = api.post("/api/usage").respond(429, json={"error": "Monthly limit reached"})
+
+    with TokenTally(API_KEY) as tt:
+        with pytest.raises(RateLimitError, match="Monthly limit reached"):
+            tt.track(tokens_in=10, tokens_out=20, model="m")
+
+    assert route.call_count == 1
+
+
+def test_unexpected_status_raises(api):
+    api.post("/api/usage").respond(302, headers={"Location": "/elsewhere"}, content=b"{}")
+
+    with TokenTally(API_KEY) as tt:
+        with pytest.raises(tokentally.client.TokenTallyError):
+            tt.track(tokens_in=10, tokens_out=20, model="m")
+
+
+def test_track_usage_data_sends_every_call(api):
+    route = api.post("/api/usage").respond(200, json=USAGE_OK)
+    usage = UsageData(10, 20, "m")
+
+    tt = TokenTally(API_KEY)
+    tt.track_usage_data(usage)
+    usage.tokens_in = 999
+    tt.track_usage_data(usage)
+
+    assert route.call_count == 2
+    assert json.loads(route.calls[1].request.content)["tokens_in"] == 999
+    keys = {call.request.headers["Idempotency-Key"] for call in route.calls}
+    assert len(keys) == 2
+
+
+def test_buffered_sends_once_batch_is_full(api):
+    route = api.post("/api/usage/batch").respond(200, json=batch_ok(2))
+
+    tt = BufferedTokenTally(API_KEY, max_batch=2, flush_interval=60)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    assert route.call_count == 0
+
+    tt.track(tokens_in=3, tokens_out=4, model="m")
+    assert route.call_count == 1
+    assert len(json.loads(route.calls[0].request.content)["usages"]) == 2
+
+
+def test_buffered_max_batch_must_be_positive():
+    with pytest.raises(ValueError):
+        BufferedTokenTally(API_KEY, max_batch=0)
+
+
+def test_buffered_flush_sends_everything_buffered(api):
+    route = api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    tt = BufferedTokenTally(API_KEY, max_batch=10, flush_interval=60)
+    assert tt.track(tokens_in=1, tokens_out=2, model="m").record_id == ""
+
+    tt.flush()
+    tt.flush()
+
+    assert route.call_count == 1
+
+
+def test_async_send_queues_and_flushes_in_one_batch(api):
+    started, release, hold = held_responses()
+    route = api.post("/api/usage/batch").mock(side_effect=hold)
+
+    tt = TokenTally(API_KEY, async_send=True)
+    assert tt.track(tokens_in=1, tokens_out=2, model="m").record_id == ""
+    assert started.wait(5)
+    tt.track(tokens_in=3, tokens_out=4, model="m")
+    tt.track(tokens_in=5, tokens_out=6, model="m")
+    release.set()
+
+    assert tt.flush(timeout=5) is True
+    assert route.call_count == 2
+    assert len(json.loads(route.calls[1].request.content)["usages"]) == 2
+
+
+def test_async_send_retries_failed_batches(api):
+    route = api.post("/api/usage/batch").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json=batch_ok(1))]
+    )
+
+    tt = TokenTally(API_KEY, async_send=True)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+
+    assert tt.flush(timeout=5) is True
+    assert route.call_count == 2
+
+
+def test_async_send_drops_records_when_queue_is_full(api):
+    started, release, hold = held_responses()
+    api.post("/api/usage/batch").mock(side_effect=hold)
+
+    tt = TokenTally(API_KEY, async_send=True, max_queue_size=1)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    assert started.wait(5)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    release.set()
+
+    assert tt.dropped_count == 1
+    assert tt.flush(timeout=5) is True
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        TokenTally(API_KEY, async_send=True, overflow_policy="spill")
+
+
+def test_context_manager_flushes_and_closes(api):
+    route = api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    with BufferedTokenTally(API_KEY, max_batch=10, flush_interval=60) as tt:
+        tt.track(tokens_in=1, tokens_out=2, model="m")
+        assert route.call_count == 0
+
+    assert route.call_count == 1
+    assert tt._client.is_closed
+
+
+def test_buffered_close_logs_flush_errors(api, caplog):
+    api.post("/api/usage/batch").respond(400)
+
+    with pytest.raises(KeyError):
+        with BufferedTokenTally(API_KEY, max_batch=10, flush_interval=60) as tt:
+            tt.track(tokens_in=1, tokens_out=2, model="m")
+            raise KeyError("caller error")
+
+    assert tt._client.is_closed
+    assert "Failed to flush buffered TokenTally usage on close" in caplog.text
+
+@pytest.fixture
+def default_clients(monkeypatch):
+    clients = {}
+    monkeypatch.setattr(tokentally.client, "_default_clients", clients)
+    monkeypatch.delenv("TOKENTALLY_API_KEY", raising=False)
+    yield clients
+    for tt in clients.values():
+        tt.close()
+
+
+def test_get_default_client_is_shared_per_key(default_clients):
+    tt = get_default_client("tt_a")
+
+    assert get_default_client("tt_a") is tt
+    assert get_default_client("tt_b") is not tt
+    assert tt.api_key == "tt_a"
+
+
+def test_get_default_client_reads_env(default_clients, monkeypatch):
+    monkeypatch.setenv("TOKENTALLY_API_KEY", "tt_env")
+
+    tt = get_default_client()
+
+    assert tt.api_key == "tt_env"
+    assert get_default_client("tt_env") is tt
+
+
+def test_get_default_client_requires_key(default_clients):
+    with pytest.raises(ValueError):
+        get_default_client()
+    assert default_clients == {}
+
+
+def test_get_default_client_builds_one_client_across_threads(default_clients):
+    start = threading.Barrier(8)
+    clients = []
+
+    def get():
+        start.wait()
+        clients.append(get_default_client("tt_a"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(tt) for tt in clients}) == 1
+    assert list(default_clients) == ["tt_a"]
+
+
+def test_track_usage_times_block_and_records_errors(api, monkeypatch):
+    route = api.post("/api/usage").respond(200, json=USAGE_OK)
+    ticks = iter([1_000_000_000, 1_250_900_000])
+    monkeypatch.setattr(tokentally.client.time, "monotonic_ns", lambda: next(ticks))
+
+    with TokenTally(API_KEY) as tt:
+        with pytest.raises(RuntimeError):
+            with tt.track_usage(model="m") as ctx:
+                ctx.set_usage(tokens_in=1, tokens_out=2)
+                raise RuntimeError("boom")
+
+    body = json.loads(route.calls[0].request.content)
+    assert body["runtime_ms"] == 250
+    assert body["error_message"] == "boom"
+
+
+def test_sample_rate_zero_sends_nothing_but_batches(api):
+    usage_route = api.post("/api/usage")
+    batch_route = api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    with TokenTally(API_KEY, sample_rate=0.0) as tt:
+        response = tt.track(tokens_in=1, tokens_out=2, model="m")
+        with tt.track_usage(model="m") as ctx:
+            ctx.set_usage(tokens_in=1, tokens_out=2)
+        tt.track_batch([UsageData(1, 2, "m")])
+
+    assert usage_route.call_count == 0
+    assert (response.success, response.record_id) == (True, "")
+    assert ctx.response.record_id == ""
+    assert batch_route.call_count == 1
+
+
+def test_sample_rate_one_sends_everything(api):
+    route = api.post("/api/usage").respond(200, json=USAGE_OK)
+
+    with TokenTally(API_KEY, sample_rate=1.0) as tt:
+        for _ in range(20):
+            tt.track(tokens_in=1, tokens_out=2, model="m")
+
+    assert route.call_count == 20
+
+
+@pytest.mark.parametrize("rate", [-0.1, 1.5])
+def test_sample_rate_out_of_range(rate):
+    with pytest.raises(ValueError):
+        TokenTally(API_KEY, sample_rate=rate)
+
+
+def test_deferred_track_returns_estimated_cost(api):
+    api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    with BufferedTokenTally(API_KEY, max_batch=10, flush_interval=60) as tt:
+        response = tt.track(tokens_in=1000, tokens_out=100, model="claude-3-haiku-20240307")
+
+    assert (response.success, response.record_id) == (True, "")
+    assert response.cost_usd == pytest.approx(1000 * 0.25e-6 + 100 * 1.25e-6)
+
+
+def test_refresh_prices_updates_estimates(api, monkeypatch):
+    monkeypatch.setattr(prices, "MODEL_PRICES", dict(prices.MODEL_PRICES))
+    monkeypatch.setattr(prices, "_resolved", {})
+    api.get("/api/prices").respond(
+        200, json={"prices": {"new-model": {"input": 1e-6, "output": 2e-6}}}
+    )
+
+    assert estimate_cost(UsageData(10, 20, "new-model-2025")) is None
+    with TokenTally(API_KEY) as tt:
+        tt.refresh_prices()
+
+    assert estimate_cost(UsageData(10, 20, "new-model-2025")) == pytest.approx(5e-5)
+
+
+def test_refresh_prices_raises_on_error(api):
+    api.get("/api/prices").respond(500)
+
+    with TokenTally(API_KEY, max_retries=0) as tt:
+        with pytest.raises(tokentally.client.TokenTallyError):
+            tt.refresh_prices()
+
+
+def test_spool_replays_records_after_restart(api, tmp_path):
+    path = str(tmp_path / "spool.db")
+    spool = DiskSpool(path)
+    spool.append(b'{"tokens_in":1}')
+    spool.append(b'{"tokens_in":2}')
+    spool.close()
+    route = api.post("/api/usage/batch").respond(200, json=batch_ok(2))
+
+    tt = TokenTally(API_KEY, async_send=True, spool_path=path)
+    assert tt.flush(timeout=5) is True
+    tt.close()
+
+    assert route.call_count == 1
+    assert route.calls[0].request.content == b'{"usages":[{"tokens_in":1},{"tokens_in":2}]}'
+    spool = DiskSpool(path)
+    assert spool.pending() == []
+    spool.close()
+
+
+def test_spool_keeps_records_until_sent(api, tmp_path):
+    path = str(tmp_path / "spool.db")
+    api.post("/api/usage/batch").respond(503)
+
+    tt = TokenTally(API_KEY, async_send=True, max_retries=0, spool_path=path)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    tt.flush(timeout=5)
+
+    assert [json.loads(payload)["tokens_in"] for _, _, payload in tt._spool.pending()] == [1]
+    tt.close()
+
+
+def test_spool_resends_failed_batch_with_same_key(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(tokentally.client, "_SPOOL_RETRY_INTERVAL", 0.05)
+    route = api.post("/api/usage/batch").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json=batch_ok(1))]
+    )
+
+    tt = TokenTally(API_KEY, async_send=True, max_retries=0, spool_path=str(tmp_path / "s.db"))
+    tt.track(tokens_in=10, tokens_out=20, model="m")
+    assert tt.flush(timeout=5) is False
+
+    wait_for(lambda: not tt._spool.pending())
+
+    assert route.call_count == 2
+    keys = [call.request.headers["Idempotency-Key"] for call in route.calls]
+    assert keys[0] == keys[1]
+    tt.close()
+
+
+def test_spool_is_locked_to_one_client(api, tmp_path):
+    path = str(tmp_path / "spool.db")
+    tt = TokenTally(API_KEY, async_send=True, spool_path=path)
+
+    with pytest.raises(ValueError):
+        TokenTally(API_KEY, async_send=True, spool_path=path)
+
+    tt.close()
+    TokenTally(API_KEY, async_send=True, spool_path=path).close()
+
+
+def test_flush_waits_for_spooled_resends(api, tmp_path):
+    route = api.post("/api/usage/batch").mock(
+        side_effect=[
+            httpx.Response(503),
+            httpx.Response(200, json=batch_ok(1)),
+            httpx.Response(200, json=batch_ok(1)),
+        ]
+    )
+
+    tt = TokenTally(API_KEY, async_send=True, max_retries=0, spool_path=str(tmp_path / "s.db"))
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    assert tt.flush(timeout=5) is False
+    assert tt.flush(timeout=5) is False
+
+    tt.track(tokens_in=3, tokens_out=4, model="m")
+    assert tt.flush(timeout=5) is True
+
+    assert route.call_count == 3
+    assert tt._spool.pending() == []
+    tt.close()
+
+
+def test_close_releases_spool_when_flush_fails(api, tmp_path):
+    path = str(tmp_path / "spool.db")
+    api.post("/api/usage/batch").respond(503)
+
+    tt = TokenTally(API_KEY, async_send=True, max_retries=0, spool_path=path)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    tt.close()
+
+    spool = DiskSpool(path)
+    assert len(spool.pending()) == 1
+    spool.close()
+
+
+def test_failed_ack_does_not_raise(api, tmp_path):
+    api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    tt = TokenTally(API_KEY, async_send=True, spool_path=str(tmp_path / "s.db"))
+    row_id, key = tt._spool.append(b'{"tokens_in":1}')
+    tt._spool.close()
+
+    assert tt._deliver([(row_id, key, b'{"tokens_in":1}')]) is False
+    assert len(tt._unsent) == 1
+    tt.close()
+
+def test_spool_path_requires_async_send(tmp_path):
+    with pytest.raises(ValueError):
+        TokenTally(API_KEY, spool_path=str(tmp_path / "spool.db"))
+
+
+def test_buffered_flush_keeps_records_on_failure(api):
+    route = api.post("/api/usage/batch").mock(
+        side_effect=[httpx.Response(400), httpx.Response(200, json=batch_ok(2))]
+    )
+
+    tt = BufferedTokenTally(API_KEY, max_batch=10)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    tt.track(tokens_in=3, tokens_out=4, model="m")
+
+    with pytest.raises(tokentally.client.TokenTallyError):
+        tt.flush()
+    assert len(tt._buffer) == 2
+
+    assert tt.flush() is True
+    assert tt._buffer == []
+    assert route.calls[0].request.content == route.calls[1].request.content
+    tt.close()
+
+
+def test_buffered_track_does_not_raise_send_errors(api):
+    api.post("/api/usage/batch").respond(400)
+
+    tt = BufferedTokenTally(API_KEY, max_batch=2)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    response = tt.track(tokens_in=3, tokens_out=4, model="m")
+
+    assert response.record_id == ""
+    assert len(tt._buffer) == 2
+    with tt._lock:
+        tt._buffer.clear()
+    tt.close()
+
+
+def test_buffered_failed_flush_is_retried_by_timer_only(api):
+    route = api.post("/api/usage/batch").respond(503)
+
+    tt = BufferedTokenTally(API_KEY, max_retries=0, max_batch=2, flush_interval=60)
+    for _ in range(4):
+        tt.track(tokens_in=1, tokens_out=2, model="m")
+
+    assert route.call_count == 1
+    assert len(tt._buffer) == 4
+    assert tt._timer.interval == 120
+    with tt._lock:
+        tt._buffer.clear()
+    tt.close()
+
+
+def test_buffered_retry_backs_off_and_recovers(api):
+    route = api.post("/api/usage/batch").mock(
+        side_effect=[httpx.Response(503), httpx.Response(503), httpx.Response(200, json=batch_ok(1))]
+    )
+
+    tt = BufferedTokenTally(API_KEY, max_retries=0, max_batch=1, flush_interval=0.01)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    wait_for(lambda: route.call_count == 3 and not tt._buffer)
+
+    assert tt._flush_failures == 0
+    tt.close()
+
+
+def test_buffered_drops_records_beyond_max_buffer_size(api):
+    api.post("/api/usage/batch").respond(503)
+
+    tt = BufferedTokenTally(API_KEY, max_retries=0, max_batch=2, max_buffer_size=3, flush_interval=60)
+    responses = [tt.track(tokens_in=1, tokens_out=2, model="m") for _ in range(4)]
+
+    assert [r.success for r in responses] == [True, True, True, False]
+    assert tt.dropped_count == 1
+    assert len(tt._buffer) == 3
+    with tt._lock:
+        tt._buffer.clear()
+    tt.close()
+
+
+@pytest.mark.parametrize("option", ["async_send", "spool_path"])
+def test_buffered_rejects_unsupported_options(option):
+    with pytest.raises(TypeError):
+        BufferedTokenTally(API_KEY, **{option: True})
+
+
+def test_buffered_max_buffer_size_must_hold_a_batch():
+    with pytest.raises(ValueError):
+        BufferedTokenTally(API_KEY, max_batch=10, max_buffer_size=5)
+
+@requires_weakrefs
+def test_closed_buffered_client_is_garbage_collected(api):
+    api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    tt = BufferedTokenTally(API_KEY)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    tt.close()
+    ref = weakref.ref(tt)
+    del tt
+    gc.collect()
+
+    assert ref() is None
+
+
+def test_flush_reports_failed_batches(api):
+    route = api.post("/api/usage/batch").mock(
+        side_effect=[httpx.Response(503), httpx.Response(200, json=batch_ok(1))]
+    )
+
+    tt = TokenTally(API_KEY, async_send=True, max_retries=0)
+    tt.track(tokens_in=10, tokens_out=20, model="m")
+    assert tt.flush(timeout=5) is False
+
+    tt.track(tokens_in=10, tokens_out=20, model="m")
+    assert tt.flush(timeout=5) is True
+    tt.close()
+
+    assert route.call_count == 2
+
+
+def test_sender_survives_unexpected_errors(api):
+    api.post("/api/usage/batch").mock(
+        side_effect=[httpx.Response(200, content=b"not json"), httpx.Response(200, json=batch_ok(1))]
+    )
+
+    tt = TokenTally(API_KEY, async_send=True, max_retries=0)
+    tt.track(tokens_in=10, tokens_out=20, model="m")
+    assert tt.flush(timeout=5) is False
+
+    tt.track(tokens_in=10, tokens_out=20, model="m")
+    assert tt.flush(timeout=5) is True
+    tt.close()
+
+
+def test_close_stops_sender_thread(api):
+    route = api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    tt = TokenTally(API_KEY, async_send=True)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    worker = tt._worker
+    tt.close()
+
+    assert route.call_count == 1
+    assert not worker.is_alive()
+
+
+@requires_weakrefs
+def test_closed_async_send_client_is_garbage_collected(api):
+    api.post("/api/usage/batch").respond(200, json=batch_ok(1))
+
+    tt = TokenTally(API_KEY, async_send=True)
+    tt.track(tokens_in=1, tokens_out=2, model="m")
+    tt.close()
+    ref = weakref.ref(tt)
+    del tt
+    gc.collect()
+
+    assert ref() is None
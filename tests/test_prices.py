@@ -0,0 +1,52 @@
+import pytest
+
+from tokentally import UsageData, prices
+from tokentally.prices import estimate_cost, get_price, update_prices
+
+
+@pytest.fixture(autouse=True)
+def price_table(monkeypatch):
+    monkeypatch.setattr(prices, "MODEL_PRICES", dict(prices.MODEL_PRICES))
+    monkeypatch.setattr(prices, "_resolved", {})
+
+
+def test_get_price_exact_and_dated_names():
+    assert get_price("claude-3-haiku") == (0.25e-6, 1.25e-6)
+    assert get_price("claude-3-haiku-20240307") == (0.25e-6, 1.25e-6)
+    assert get_price("gpt-4o-mini-2024-07-18") == (0.15e-6, 0.6e-6)
+    assert get_price("unknown-model") is None
+
+
+def test_estimate_cost():
+    usage = UsageData(tokens_in=1000, tokens_out=500, model="claude-3-sonnet-20240229")
+
+    assert estimate_cost(usage) == pytest.approx(1000 * 3e-6 + 500 * 15e-6)
+    assert estimate_cost(UsageData(1, 1, "unknown-model")) is None
+
+
+def test_update_prices_replaces_cached_lookups():
+    assert get_price("custom-model-v2") is None
+
+    update_prices({"custom-model": (1e-6, 2e-6)})
+
+    assert get_price("custom-model-v2") == (1e-6, 2e-6)
+
+
+@pytest.mark.parametrize("model", ["gpt-4.1", "gpt-4.1-mini", "gpt-4omni", "claude-3-sonnetx"])
+def test_get_price_matches_families_on_dash_boundary(model):
+    assert get_price(model) is None
+
+
+def test_get_price_prefers_longest_family():
+    assert get_price("gpt-4-turbo-2024-04-09") == (10e-6, 30e-6)
+    assert get_price("gpt-4-0613") == (30e-6, 60e-6)
+
+
+def test_resolved_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(prices, "_MAX_RESOLVED", 3)
+
+    for i in range(10):
+        get_price(f"model-{i}")
+
+    assert len(prices._resolved) <= 3
+    assert get_price("claude-3-haiku-20240307") == (0.25e-6, 1.25e-6)
@@ -0,0 +1,63 @@
+import pytest
+
+from tokentally import UsageData, UsageResponse
+
+
+def test_usage_data_equality_and_repr():
+    usage = UsageData(1, 2, "m", credits=3)
+
+    assert usage == UsageData(1, 2, "m", credits=3)
+    assert usage != UsageData(1, 2, "m")
+    assert repr(usage).startswith("UsageData(tokens_in=1, tokens_out=2, model='m', provider='anthropic', credits=3")
+
+
+def test_usage_data_has_no_instance_dict():
+    usage = UsageData(1, 2, "m")
+
+    with pytest.raises(AttributeError):
+        usage.unknown_field = 1
+    with pytest.raises(TypeError):
+        hash(usage)
+
+
+def test_usage_metadata_is_lazy_and_mutable():
+    usage = UsageData(1, 2, "m")
+    assert "metadata" not in usage.to_dict()
+
+    usage.metadata["feature"] = "chat"
+    assert usage.to_dict()["metadata"] == {"feature": "chat"}
+
+    metadata = {}
+    assert UsageData(1, 2, "m", metadata=metadata).metadata is metadata
+
+
+def test_usage_metadata_setter():
+    usage = UsageData(1, 2, "m", metadata={"a": 1})
+    usage.metadata = {"b": 2}
+
+    assert usage.to_dict()["metadata"] == {"b": 2}
+    assert usage == UsageData(1, 2, "m", metadata={"b": 2})
+
+
+def test_usage_response_from_dict():
+    data = {"success": True, "record_id": "rec_1", "cost_usd": 0.5, "extra": 1}
+
+    assert UsageResponse.from_dict(data) == UsageResponse(True, "rec_1", 0.5)
+
+
+def test_usage_response_from_dict_fills_missing_fields():
+    assert UsageResponse.from_dict({"record_id": "rec_1"}) == UsageResponse(False, "rec_1", 0.0)
+    assert UsageResponse.from_dict({}) == UsageResponse(False, "", 0.0)
+
+
+def test_usage_response_from_dict_batch():
+    items = [
+        {"success": True, "record_id": "rec_1", "cost_usd": 0.5},
+        {"success": False, "record_id": "rec_2"},
+    ]
+
+    assert UsageResponse.from_dict_batch(items) == [
+        UsageResponse(True, "rec_1", 0.5),
+        UsageResponse(False, "rec_2", 0.0),
+    ]
+    assert UsageResponse.from_dict_batch([]) == []
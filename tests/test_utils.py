@@ -0,0 +1,47 @@
+import json
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from tokentally import _utils
+
+
+@pytest.mark.parametrize("now", [0.0, 1700000000.0, 1700000000.5, 1700000059.25, 1709251199.999])
+def test_utcnow_iso_matches_datetime(monkeypatch, now):
+    monkeypatch.setattr(_utils.time, "time", lambda: now)
+
+    expected = datetime.fromtimestamp(now, timezone.utc)
+    assert datetime.fromisoformat(_utils.utcnow_iso()) == expected
+    assert _utils.utcnow_iso()[:26] == expected.replace(tzinfo=None).isoformat(timespec="microseconds")
+
+
+def test_utcnow_iso_format():
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}\+00:00", _utils.utcnow_iso())
+
+
+def test_utcnow_iso_moves_to_next_second(monkeypatch):
+    times = iter([1700000000.75, 1700000001.0])
+    monkeypatch.setattr(_utils.time, "time", lambda: next(times))
+
+    assert _utils.utcnow_iso() == "2023-11-14T22:13:20.750000+00:00"
+    assert _utils.utcnow_iso() == "2023-11-14T22:13:21.000000+00:00"
+
+
+PAYLOAD = {"model": "m", "tokens_in": 1, "metadata": {1: "int key", "name": "café"}}
+
+
+def test_json_dumps_stdlib_fallback(monkeypatch):
+    monkeypatch.setattr(_utils, "orjson", None)
+
+    encoded = _utils.json_dumps(PAYLOAD)
+
+    assert isinstance(encoded, bytes)
+    assert encoded.startswith(b'{"model":"m","tokens_in":1,')
+    assert json.loads(encoded) == json.loads(json.dumps(PAYLOAD))
+
+
+def test_json_dumps_matches_stdlib():
+    pytest.importorskip("orjson")
+
+    assert json.loads(_utils.json_dumps(PAYLOAD)) == json.loads(json.dumps(PAYLOAD))
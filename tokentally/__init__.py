@@ -3,16 +3,24 @@
 from tokentally._version import __version__
 from tokentally.client import (
     TokenTally,
+    BufferedTokenTally,
     TokenTallyError,
     AuthenticationError,
     RateLimitError,
+    get_default_client,
 )
+from tokentally.async_client import AsyncTokenTally
+from tokentally.prices import estimate_cost
 from tokentally.types import UsageData, UsageResponse
 __all__ = [
     "TokenTally",
+    "BufferedTokenTally",
+    "AsyncTokenTally",
     "TokenTallyError",
     "AuthenticationError",
     "RateLimitError",
     "UsageData",
     "UsageResponse",
+    "get_default_client",
+    "estimate_cost",
 ]
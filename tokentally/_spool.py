@@ -0,0 +1,94 @@
+"""On-disk queue keeping unsent usage records across process restarts."""
+
+import sqlite3
+import threading
+import uuid
+from typing import IO, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+
+class SpoolLockedError(Exception):
+    """Raised when another process already has the spool open."""
+
+
+class DiskSpool:
+    """Append-only store of encoded usage records awaiting delivery.
+
+    Records are written to a SQLite database in WAL mode before they are
+    queued for sending, and deleted only once the API has accepted them. Any
+    rows left behind by a crash are returned by ``pending()`` on the next
+    start so they can be sent again.
+
+    Each row has a random key that stays the same across resends, so batches
+    of the same rows can be given the same idempotency key. Only one process
+    may use a spool at a time; a lock file next to the database enforces it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._lock_file: Optional[IO[bytes]] = self._acquire_file_lock(path + ".lock")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, payload BLOB NOT NULL)"
+        )
+
+    @staticmethod
+    def _acquire_file_lock(lock_path: str) -> IO[bytes]:
+        """Open and exclusively lock the spool's lock file."""
+        lock_file = open(lock_path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:  # pragma: no cover - Windows
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError as e:
+            lock_file.close()
+            raise SpoolLockedError(f"{lock_path} is locked by another process") from e
+        return lock_file
+
+    def append(self, record: bytes) -> Tuple[int, str]:
+        """Store an encoded record and return its (row ID, key)."""
+        key = uuid.uuid4().hex
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO pending (key, payload) VALUES (?, ?)", (key, record)
+            )
+        row_id = cursor.lastrowid
+        assert row_id is not None  # Always set after a successful INSERT.
+        return row_id, key
+
+    def ack(self, ids: Iterable[int]) -> None:
+        """Delete records that have been delivered."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("DELETE FROM pending WHERE id = ?", [(i,) for i in ids])
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def pending(self) -> List[Tuple[int, str, bytes]]:
+        """Return all stored records as (row ID, key, encoded record), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, key, payload FROM pending ORDER BY id"
+            ).fetchall()
+        return [(row_id, key, bytes(payload)) for row_id, key, payload in rows]
+
+    def close(self) -> None:
+        """Close the database connection and release the lock."""
+        with self._lock:
+            self._conn.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
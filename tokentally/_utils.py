@@ -0,0 +1,54 @@
+"""Internal helpers for the TokenTally SDK."""
+
+import json
+import time
+from typing import Any, Callable, Tuple, TypeVar
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+try:
+    from mypy_extensions import mypyc_attr
+except ImportError:  # pragma: no cover - only needed for mypyc builds
+    _T = TypeVar("_T")
+
+    def mypyc_attr(*attrs: str, **kwattrs: object) -> Callable[[_T], _T]:  # type: ignore[misc]
+        """No-op stand-in for mypy_extensions.mypyc_attr."""
+        return lambda cls: cls
+
+# (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") for the last timestamp taken.
+_second_cache: Tuple[int, str] = (-1, "")
+
+
+def utcnow_iso() -> str:
+    """Return the current UTC time as an ISO-8601 string.
+
+    Equivalent to ``datetime.now(timezone.utc).isoformat()`` but without
+    building a datetime. The date/time prefix only changes once a second, so
+    it is formatted once and reused.
+    """
+    global _second_cache
+
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _second_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _second_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}+00:00"
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def json_loads(data: bytes) -> Any:
+    """Deserialize JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
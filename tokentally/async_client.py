@@ -0,0 +1,255 @@
+"""Asynchronous TokenTally client for use with asyncio."""
+
+import asyncio
+import time
+import uuid
+import warnings
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncGenerator, List
+
+import httpx
+
+from tokentally.client import _BaseTokenTally, TokenTallyError, UsageContext
+from tokentally.prices import update_prices
+from tokentally.types import UsageData, UsageResponse
+
+
+class AsyncTokenTally(_BaseTokenTally):
+    """Asynchronous client for tracking AI API usage with TokenTally.
+
+    Tracking never blocks the event loop, so it is safe to call from async web
+    frameworks, and many calls can be awaited concurrently with
+    ``asyncio.gather``. Call ``aclose()`` when you are done with the client,
+    or use it as an async context manager.
+
+    Example:
+        >>> from tokentally import AsyncTokenTally
+        >>> tt = AsyncTokenTally(api_key="your_api_key")
+        >>>
+        >>> await tt.track(
+        ...     tokens_in=100,
+        ...     tokens_out=200,
+        ...     model="claude-3-sonnet-20240229",
+        ... )
+        >>>
+        >>> async with tt.track_usage(model="claude-3-sonnet") as ctx:
+        ...     response = await anthropic.messages.create(...)
+        ...     ctx.set_usage(
+        ...         tokens_in=response.usage.input_tokens,
+        ...         tokens_out=response.usage.output_tokens,
+        ...     )
+        >>>
+        >>> await tt.aclose()
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool = False,
+        max_retries: int = 2,
+        sample_rate: float = 1.0,
+    ):
+        """Initialize async TokenTally client.
+
+        Args:
+            api_key: Your TokenTally API key (starts with 'tt_').
+            base_url: Optional custom API base URL.
+            timeout: Request timeout in seconds.
+            max_connections: Maximum number of concurrent connections.
+            max_keepalive_connections: Maximum number of idle connections kept open.
+            http2: Use HTTP/2. Requires the 'http2' extra to be installed.
+            max_retries: Times to retry a request after a network or server error.
+            sample_rate: Fraction of tracked records to send, from 0 to 1.
+        """
+        super().__init__(
+            api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            http2=http2,
+            max_retries=max_retries,
+            sample_rate=sample_rate,
+        )
+
+        self._closed = False
+        self._client = httpx.AsyncClient(**self._client_options())
+
+    async def __aenter__(self) -> "AsyncTokenTally":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def __del__(self):
+        """Warn if the HTTP client was never closed."""
+        if hasattr(self, "_client") and not self._closed:
+            warnings.warn(
+                f"Unclosed {type(self).__name__}; call 'await aclose()' when done",
+                ResourceWarning,
+                source=self,
+            )
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        self._closed = True
+        await self._client.aclose()
+
+    async def track(
+        self,
+        tokens_in: int = 0,
+        tokens_out: int = 0,
+        model: str = "",
+        provider: str = "anthropic",
+        runtime_ms: Optional[int] = None,
+        stop_reason: Optional[str] = None,
+        error_message: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        credits: Optional[int] = None,
+        resolution: Optional[str] = None,
+        quality: Optional[str] = None,
+    ) -> UsageResponse:
+        """Record usage data.
+
+        Takes the same arguments as ``TokenTally.track``.
+
+        Returns:
+            UsageResponse with record ID and calculated cost.
+
+        Raises:
+            RateLimitError: If rate limit is exceeded.
+            AuthenticationError: If API key is invalid.
+            TokenTallyError: For other errors.
+        """
+        usage = self._new_usage(
+            tokens_in,
+            tokens_out,
+            model,
+            provider,
+            runtime_ms,
+            stop_reason,
+            error_message,
+            metadata,
+            credits,
+            resolution,
+            quality,
+        )
+
+        return await self._submit(usage)
+
+    async def track_usage_data(self, usage: UsageData) -> UsageResponse:
+        """Record usage from a UsageData object.
+
+        Args:
+            usage: UsageData object with usage details.
+
+        Returns:
+            UsageResponse with record ID and calculated cost.
+        """
+        self._stamp([usage])
+        return await self._submit(usage)
+
+    async def track_batch(self, usages: List[UsageData]) -> List[UsageResponse]:
+        """Record several usage records in a single request.
+
+        Args:
+            usages: UsageData objects to record.
+
+        Returns:
+            One UsageResponse per record, in the order they were given.
+        """
+        if not usages:
+            return []
+
+        self._stamp(usages)
+        return await self._send_batch(usages)
+
+    @asynccontextmanager
+    async def track_usage(
+        self,
+        model: str,
+        provider: str = "anthropic",
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> AsyncGenerator[UsageContext, None]:
+        """Async context manager for tracking usage with automatic timing.
+
+        Args:
+            model: The model name.
+            provider: The AI provider.
+            metadata: Optional custom metadata.
+
+        Yields:
+            UsageContext for setting usage details.
+        """
+        ctx = UsageContext(
+            client=self,
+            model=model,
+            provider=provider,
+            metadata=metadata or {},
+        )
+
+        start_ns = time.monotonic_ns()
+
+        try:
+            yield ctx
+        except Exception as e:
+            ctx.error_message = str(e)
+            raise
+        finally:
+            ctx.runtime_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+
+            # Only send if usage was set
+            if ctx._has_usage():
+                ctx._response = await self._submit(ctx._to_usage_data())
+
+    async def refresh_prices(self) -> None:
+        """Update the local price table used for cost estimates from the API."""
+        try:
+            data = self._parse_response(await self._client.get("/api/prices"))
+        except httpx.HTTPError as e:
+            raise TokenTallyError(f"Request failed: {e}") from e
+        update_prices(self._parse_prices(data))
+
+    async def _submit(self, usage: UsageData) -> UsageResponse:
+        """Apply sampling, then hand usage data off for delivery."""
+        if self._sampled_out():
+            return self._sampled_response()
+        return await self._send_usage(usage)
+
+    async def _send_usage(self, usage: UsageData) -> UsageResponse:
+        """Send usage data to API."""
+        data = await self._post("/api/usage", self._encode(usage), uuid.uuid4().hex)
+        return UsageResponse.from_dict(data)
+
+    async def _send_batch(self, usages: List[UsageData]) -> List[UsageResponse]:
+        """Send several usage records to API in one request."""
+        records = [self._encode(u) for u in usages]
+        data = await self._post(
+            "/api/usage/batch", self._batch_content(records), uuid.uuid4().hex
+        )
+        return UsageResponse.from_dict_batch(data.get("results", []))
+
+    async def _post(self, path: str, content: bytes, idempotency_key: str) -> Dict[str, Any]:
+        """POST a JSON request body and return the decoded response body.
+
+        Retries like ``TokenTally._post``, without blocking the event loop.
+        """
+        headers = {"Idempotency-Key": idempotency_key}
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.post(path, content=content, headers=headers)
+                if response.status_code < 500 or not self._should_retry(attempt):
+                    return self._parse_response(response)
+            except httpx.TransportError as e:
+                if not self._should_retry(attempt):
+                    raise TokenTallyError(f"Request failed: {e}") from e
+            except httpx.HTTPError as e:
+                raise TokenTallyError(f"Request failed: {e}") from e
+
+            await asyncio.sleep(self._retry_delay(attempt))
+            attempt += 1
@@ -1,15 +1,47 @@
 """TokenTally client for tracking AI API usage."""
 
+import atexit
+import functools
+import hashlib
+import logging
+import os
+import queue
+import random
+import threading
 import time
+import uuid
+import weakref
 from contextlib import contextmanager
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any, Generator
+from typing import Optional, ClassVar, Dict, Any, Callable, Generator, List, Tuple
 
 import httpx
 
+from tokentally._spool import DiskSpool, SpoolLockedError
+from tokentally._utils import json_dumps, json_loads, mypyc_attr, utcnow_iso
 from tokentally._version import __version__
+from tokentally.prices import estimate_cost, update_prices
 from tokentally.types import UsageData, UsageResponse
 
+logger = logging.getLogger(__name__)
+
+USER_AGENT = f"tokentally-python/{__version__}"
+
+# Per-thread random generators for sampling, so threads never contend on one.
+_thread_random = threading.local()
+
+# Failed requests are retried after 0.5s, 1s, 2s, ...
+_RETRY_BACKOFF = 0.5
+
+# Longest wait before BufferedTokenTally retries a failed flush.
+_MAX_FLUSH_RETRY_INTERVAL = 300.0
+
+# Seconds between attempts to resend spooled records whose batch failed.
+_SPOOL_RETRY_INTERVAL = 30.0
+
+# A queued record: (spool row ID, spool key, encoded record). Without a
+# spool, the row ID and key are None.
+_QueuedRecord = Tuple[Optional[int], Optional[str], bytes]
+
 
 class TokenTallyError(Exception):
     """Base exception for TokenTally errors."""
@@ -29,7 +61,168 @@ class AuthenticationError(TokenTallyError):
     pass
 
 
-class TokenTally:
+# Subclassable from interpreted code when compiled with mypyc.
+@mypyc_attr(allow_interpreted_subclasses=True)
+class _BaseTokenTally:
+    """Configuration and request handling shared by the sync and async clients."""
+
+    DEFAULT_BASE_URL: ClassVar[str] = "https://api.tokentally.cloud"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool = False,
+        max_retries: int = 2,
+        sample_rate: float = 1.0,
+    ):
+        if not api_key or not api_key.startswith("tt_"):
+            raise ValueError("Invalid API key. Must start with 'tt_'")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+
+        self.api_key = api_key
+        self.base_url = (base_url or self.DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.sample_rate = sample_rate
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=30.0,
+        )
+        self._headers = httpx.Headers(
+            {
+                "X-API-Key": self.api_key,
+                "Content-Type": "application/json",
+                "User-Agent": USER_AGENT,
+            }
+        )
+
+    def _client_options(self) -> Dict[str, Any]:
+        """Keyword arguments for constructing the underlying httpx client."""
+        return {
+            "base_url": self.base_url,
+            "headers": self._headers,
+            "timeout": self.timeout,
+            "http2": self.http2,
+            "limits": self.limits,
+        }
+
+    @staticmethod
+    def _new_usage(
+        tokens_in: int,
+        tokens_out: int,
+        model: str,
+        provider: str,
+        runtime_ms: Optional[int],
+        stop_reason: Optional[str],
+        error_message: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        credits: Optional[int],
+        resolution: Optional[str],
+        quality: Optional[str],
+    ) -> UsageData:
+        """Build a timestamped UsageData from track() arguments."""
+        return UsageData(
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+            model=model,
+            provider=provider,
+            credits=credits,
+            resolution=resolution,
+            quality=quality,
+            runtime_ms=runtime_ms,
+            stop_reason=stop_reason,
+            error_message=error_message,
+            metadata=metadata,
+            timestamp=utcnow_iso(),
+        )
+
+    @staticmethod
+    def _stamp(usages: List[UsageData]) -> None:
+        """Fill in missing timestamps with the current time."""
+        now = utcnow_iso()
+        for usage in usages:
+            if usage.timestamp is None:
+                usage.timestamp = now
+
+    @staticmethod
+    def _encode(usage: UsageData) -> bytes:
+        """Serialize a usage record to its JSON request representation."""
+        return json_dumps(usage.to_dict())
+
+    @staticmethod
+    def _batch_content(records: List[bytes]) -> bytes:
+        """Assemble a batch request body from already encoded records."""
+        return b'{"usages":[' + b",".join(records) + b"]}"
+
+    def _sampled_out(self) -> bool:
+        """Whether to skip sending the current record due to sampling."""
+        if self.sample_rate >= 1.0:
+            return False
+
+        rng = getattr(_thread_random, "rng", None)
+        if rng is None:
+            rng = _thread_random.rng = random.Random()
+        return rng.random() >= self.sample_rate
+
+    @staticmethod
+    def _sampled_response() -> UsageResponse:
+        """Placeholder response for a record skipped by sampling."""
+        return UsageResponse(success=True, record_id="", cost_usd=0.0)
+
+    @staticmethod
+    def _estimated_response(usage: UsageData, success: bool = True) -> UsageResponse:
+        """Response for a record whose delivery is deferred, with local cost."""
+        return UsageResponse(
+            success=success, record_id="", cost_usd=estimate_cost(usage) or 0.0
+        )
+
+    @staticmethod
+    def _parse_prices(data: Dict[str, Any]) -> Dict[str, Tuple[float, float]]:
+        """Convert an /api/prices response into price table entries."""
+        return {
+            model: (price["input"], price["output"])
+            for model, price in data.get("prices", {}).items()
+        }
+
+    def _should_retry(self, attempt: int) -> bool:
+        """Whether a failed request attempt should be retried."""
+        return attempt < self.max_retries
+
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """Seconds to wait before retrying after the given attempt."""
+        return _RETRY_BACKOFF * 2**attempt
+
+    @staticmethod
+    def _parse_response(response: httpx.Response) -> Dict[str, Any]:
+        """Check an API response for errors and return its decoded body.
+
+        The body is decoded at most once, with orjson when installed, instead
+        of going through ``response.json()``.
+        """
+        status_code = response.status_code
+        if 200 <= status_code < 300:
+            return json_loads(response.content)
+        if status_code == 401:
+            raise AuthenticationError("Invalid API key")
+        if status_code == 429:
+            data = json_loads(response.content)
+            raise RateLimitError(data.get("error", "Rate limit exceeded"))
+
+        # raise_for_status() raises for every non-2xx status, so this never returns.
+        response.raise_for_status()
+        raise TokenTallyError(f"Unexpected response status {status_code}")
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
+class TokenTally(_BaseTokenTally):
     """Client for tracking AI API usage with TokenTally.
 
     Example:
@@ -46,15 +239,34 @@ class TokenTally:
         >>> # Or use context manager for automatic timing
         >>> with tt.track_usage(model="claude-3-sonnet", metadata={"feature": "chat"}):
         ...     response = anthropic.messages.create(...)
+        >>>
+        >>> tt.close()
+
+    The client can also be used as a context manager, which closes it on exit.
+
+    With ``async_send=True``, tracked usage is queued and delivered in batches
+    by a background thread, so ``track()`` returns without waiting on the
+    network. The response it returns then has an empty record ID and a cost
+    estimated from the local price table (see ``tokentally.prices``).
     """
 
-    DEFAULT_BASE_URL = "https://api.tokentally.cloud"
+    OVERFLOW_POLICIES: ClassVar[Tuple[str, ...]] = ("drop", "block")
 
     def __init__(
         self,
         api_key: str,
         base_url: Optional[str] = None,
         timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool = False,
+        max_retries: int = 2,
+        sample_rate: float = 1.0,
+        async_send: bool = False,
+        max_batch: int = 100,
+        max_queue_size: int = 10_000,
+        overflow_policy: str = "drop",
+        spool_path: Optional[str] = None,
     ):
         """Initialize TokenTally client.
 
@@ -62,28 +274,103 @@ class TokenTally:
             api_key: Your TokenTally API key (starts with 'tt_').
             base_url: Optional custom API base URL.
             timeout: Request timeout in seconds.
+            max_connections: Maximum number of concurrent connections.
+            max_keepalive_connections: Maximum number of idle connections kept open.
+            http2: Use HTTP/2. Requires the 'http2' extra to be installed.
+            max_retries: Times to retry a request after a network or server error.
+            sample_rate: Fraction of tracked records to send, from 0 to 1.
+                Skipped records get a response with an empty record ID.
+            async_send: Send usage from a background thread instead of the caller's.
+            max_batch: Maximum number of records sent in one batch request.
+            max_queue_size: Maximum number of records waiting to be sent in
+                async_send mode.
+            overflow_policy: What to do when the async_send queue is full:
+                'drop' discards the record, 'block' waits for space.
+            spool_path: SQLite file in which async_send mode keeps records
+                until the API accepts them. Records left over from a previous
+                process, e.g. after a crash, are sent on startup.
         """
-        if not api_key or not api_key.startswith("tt_"):
-            raise ValueError("Invalid API key. Must start with 'tt_'")
-
-        self.api_key = api_key
-        self.base_url = (base_url or self.DEFAULT_BASE_URL).rstrip("/")
-        self.timeout = timeout
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Invalid overflow_policy. Must be one of {self.OVERFLOW_POLICIES}"
+            )
+        if spool_path is not None and not async_send:
+            raise ValueError("spool_path requires async_send=True")
 
-        self._client = httpx.Client(
-            base_url=self.base_url,
-            headers={
-                "X-API-Key": self.api_key,
-                "Content-Type": "application/json",
-                "User-Agent": f"tokentally-python/{__version__}",
-            },
+        super().__init__(
+            api_key,
+            base_url=base_url,
             timeout=timeout,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            http2=http2,
+            max_retries=max_retries,
+            sample_rate=sample_rate,
         )
 
+        self.async_send = async_send
+        self.max_batch = max_batch
+        self.overflow_policy = overflow_policy
+        self.dropped_count = 0
+        self._failed_batches = 0
+
+        self._client = httpx.Client(**self._client_options())
+        self._exit_flush: Optional[Callable[[], None]] = None
+
+        # None on the queue tells the sender thread to exit.
+        self._queue: Optional["queue.Queue[Optional[_QueuedRecord]]"] = None
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._spool: Optional[DiskSpool] = None
+        # Spooled records whose batch failed; only the sender thread changes it.
+        self._unsent: List[_QueuedRecord] = []
+        # Cleared while the sender thread is resending _unsent.
+        self._resent = threading.Event()
+        self._resent.set()
+        if async_send:
+            self._queue = queue.Queue(maxsize=max_queue_size)
+            if spool_path is not None:
+                try:
+                    self._spool = DiskSpool(spool_path)
+                except SpoolLockedError as e:
+                    raise ValueError(
+                        f"spool_path {spool_path!r} is already in use by another process"
+                    ) from e
+                self._unsent = list(self._spool.pending())
+                if self._unsent:
+                    self._resent.clear()
+                    self._ensure_worker()
+            self._register_flush_at_exit(timeout)
+
+    def __enter__(self) -> "TokenTally":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
     def __del__(self):
-        """Cleanup HTTP client."""
-        if hasattr(self, "_client"):
+        """Best-effort cleanup if close() was never called."""
+        try:
             self._client.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Send any pending usage and close the underlying HTTP client."""
+        if self._exit_flush is not None:
+            atexit.unregister(self._exit_flush)
+            self._exit_flush = None
+
+        try:
+            self.flush(self.timeout)
+        finally:
+            self._stop_worker()
+            self._client.close()
+            # Unsent records stay in the file for the next process.
+            if self._spool is not None:
+                self._spool.close()
 
     def track(
         self,
@@ -115,29 +402,30 @@ class TokenTally:
             quality: Optional image quality (e.g., 'standard', 'hd').
 
         Returns:
-            UsageResponse with record ID and calculated cost.
+            UsageResponse with record ID and calculated cost. If the usage was
+            queued for later submission, the record ID is empty and the cost
+            is estimated locally.
 
         Raises:
             RateLimitError: If rate limit is exceeded.
             AuthenticationError: If API key is invalid.
             TokenTallyError: For other errors.
         """
-        usage = UsageData(
-            tokens_in=tokens_in,
-            tokens_out=tokens_out,
-            model=model,
-            provider=provider,
-            credits=credits,
-            resolution=resolution,
-            quality=quality,
-            runtime_ms=runtime_ms,
-            stop_reason=stop_reason,
-            error_message=error_message,
-            metadata=metadata or {},
-            timestamp=datetime.now(timezone.utc),
+        usage = self._new_usage(
+            tokens_in,
+            tokens_out,
+            model,
+            provider,
+            runtime_ms,
+            stop_reason,
+            error_message,
+            metadata,
+            credits,
+            resolution,
+            quality,
         )
 
-        return self._send_usage(usage)
+        return self._submit(usage)
 
     def track_usage_data(self, usage: UsageData) -> UsageResponse:
         """Record usage from a UsageData object.
@@ -146,11 +434,38 @@ class TokenTally:
             usage: UsageData object with usage details.
 
         Returns:
-            UsageResponse with record ID and calculated cost.
+            UsageResponse with record ID and calculated cost. If the usage was
+            queued for later submission, the record ID is empty and the cost
+            is estimated locally.
+        """
+        self._stamp([usage])
+        return self._submit(usage)
+
+    def track_batch(self, usages: List[UsageData]) -> List[UsageResponse]:
+        """Record several usage records in a single request.
+
+        Example:
+            >>> tt.track_batch([
+            ...     UsageData(tokens_in=100, tokens_out=200, model="claude-3-sonnet"),
+            ...     UsageData(tokens_in=50, tokens_out=80, model="claude-3-haiku"),
+            ... ])
+
+        Args:
+            usages: UsageData objects to record.
+
+        Returns:
+            One UsageResponse per record, in the order they were given.
+
+        Raises:
+            RateLimitError: If rate limit is exceeded.
+            AuthenticationError: If API key is invalid.
+            TokenTallyError: For other errors.
         """
-        if usage.timestamp is None:
-            usage.timestamp = datetime.now(timezone.utc)
-        return self._send_usage(usage)
+        if not usages:
+            return []
+
+        self._stamp(usages)
+        return self._send_batch(usages)
 
     @contextmanager
     def track_usage(
@@ -185,7 +500,7 @@ class TokenTally:
             metadata=metadata or {},
         )
 
-        start_time = time.perf_counter()
+        start_ns = time.monotonic_ns()
 
         try:
             yield ctx
@@ -193,29 +508,493 @@ class TokenTally:
             ctx.error_message = str(e)
             raise
         finally:
-            end_time = time.perf_counter()
-            ctx.runtime_ms = int((end_time - start_time) * 1000)
+            ctx.runtime_ms = (time.monotonic_ns() - start_ns) // 1_000_000
 
             # Only send if usage was set
-            if ctx.tokens_in is not None or ctx.tokens_out is not None or ctx.credits is not None:
-                ctx._send()
+            if ctx._has_usage():
+                ctx._response = self._submit(ctx._to_usage_data())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued usage has been sent.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            True if everything was sent, False if the timeout expired first,
+            a batch failed to send since the last flush, or spooled records
+            are still waiting to be resent.
+        """
+        if self._queue is None:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        if not self._resent.wait(remaining):
+            return False
+
+        with self._worker_lock:
+            failed, self._failed_batches = self._failed_batches, 0
+            unsent = bool(self._unsent)
+        return not failed and not unsent
+
+    def refresh_prices(self) -> None:
+        """Update the local price table used for cost estimates from the API.
+
+        Raises:
+            AuthenticationError: If API key is invalid.
+            TokenTallyError: For other errors.
+        """
+        try:
+            data = self._parse_response(self._client.get("/api/prices"))
+        except httpx.HTTPError as e:
+            raise TokenTallyError(f"Request failed: {e}") from e
+        update_prices(self._parse_prices(data))
+
+    def _register_flush_at_exit(self, timeout: Optional[float]) -> None:
+        """Flush when the interpreter exits, without keeping the client alive.
+
+        Classes compiled with mypyc don't support weak references; there the
+        hook holds the client until ``close()`` unregisters it.
+        """
+        ref: Callable[[], Optional[TokenTally]]
+        try:
+            ref = weakref.ref(self)
+        except TypeError:
+            ref = lambda: self  # noqa: E731
+        self._exit_flush = functools.partial(_flush_at_exit, ref, timeout)
+        atexit.register(self._exit_flush)
+
+    def _submit(self, usage: UsageData) -> UsageResponse:
+        """Apply sampling, then hand usage data off for delivery."""
+        if self._sampled_out():
+            return self._sampled_response()
+        return self._dispatch(usage)
+
+    def _dispatch(self, usage: UsageData) -> UsageResponse:
+        """Deliver usage data. Subclasses may defer sending."""
+        if self._queue is None:
+            return self._send_usage(usage)
+
+        record = self._encode(usage)
+        row_id, key = (None, None) if self._spool is None else self._spool.append(record)
+        self._ensure_worker()
+        if self.overflow_policy == "block":
+            self._queue.put((row_id, key, record))
+            return self._estimated_response(usage)
+
+        try:
+            self._queue.put_nowait((row_id, key, record))
+        except queue.Full:
+            if self._spool is not None and row_id is not None:
+                self._spool.ack([row_id])
+            with self._worker_lock:
+                self.dropped_count += 1
+            logger.warning("TokenTally send queue is full; dropping usage record")
+            return self._estimated_response(usage, success=False)
+        return self._estimated_response(usage)
+
+    def _ensure_worker(self) -> None:
+        """Start the background sender thread if it is not running."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._drain, name="tokentally-sender", daemon=True
+                )
+                self._worker.start()
+
+    def _stop_worker(self) -> None:
+        """Tell the background sender thread to exit and wait for it."""
+        worker = self._worker
+        if self._queue is None or worker is None or not worker.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=self.timeout)
+        except queue.Full:
+            logger.warning("TokenTally send queue is full; not stopping sender thread")
+            return
+        worker.join(self.timeout)
+
+    def _drain(self) -> None:
+        """Background loop sending queued usage in batches.
+
+        Spooled records from a previous process are sent first. Spooled
+        records whose batch fails are resent after the next successful
+        batch, or every ``_SPOOL_RETRY_INTERVAL`` seconds while idle. Returns
+        once ``close()`` queues None.
+        """
+        assert self._queue is not None
+        self._resend_unsent()
+
+        while True:
+            try:
+                item = self._queue.get(
+                    timeout=_SPOOL_RETRY_INTERVAL if self._unsent else None
+                )
+            except queue.Empty:
+                self._resend_unsent()
+                continue
+
+            stop = item is None
+            batch = [] if item is None else [item]
+            while not stop and len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            # Resend inside the task, so flush() also waits for the resend.
+            try:
+                if batch and self._deliver(batch) and not stop:
+                    self._resend_unsent()
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _resend_unsent(self) -> None:
+        """Try again to send spooled records whose batch failed.
+
+        The records stay in ``_unsent`` until they are sent, so ``flush()``
+        never reports them as delivered early.
+        """
+        if not self._unsent:
+            self._resent.set()
+            return
+
+        self._resent.clear()
+        try:
+            unsent = list(self._unsent)
+            failed: List[_QueuedRecord] = []
+            for i in range(0, len(unsent), self.max_batch):
+                batch = unsent[i : i + self.max_batch]
+                if not self._deliver(batch, resend=True):
+                    failed.extend(batch)
+            with self._worker_lock:
+                self._unsent = failed
+        finally:
+            self._resent.set()
+
+    def _deliver(self, batch: List[_QueuedRecord], resend: bool = False) -> bool:
+        """Send a batch from the background thread, logging any failure.
+
+        Spooled records are removed from the spool once sent. On failure they
+        are kept for another attempt, and stay in the spool for the next
+        process if this one exits first.
+
+        Args:
+            batch: Queued records to send.
+            resend: Whether the records are already kept in ``_unsent``.
+
+        Returns:
+            Whether the batch was sent.
+        """
+        keys = [key for _, key, _ in batch if key is not None]
+        if len(keys) == len(batch):
+            # Resending the same spooled rows reuses the same key.
+            idempotency_key = hashlib.sha256(",".join(keys).encode()).hexdigest()[:32]
+        else:
+            idempotency_key = uuid.uuid4().hex
+
+        try:
+            self._send_encoded_batch([record for _, _, record in batch], idempotency_key)
+            if self._spool is not None:
+                self._spool.ack([row_id for row_id, _, _ in batch if row_id is not None])
+        except Exception:
+            # Any error, not just TokenTallyError, must not stop the sender.
+            # If only the ack failed, a resend reuses the key of the sent batch.
+            logger.exception("Failed to send %d TokenTally usage records", len(batch))
+            with self._worker_lock:
+                self._failed_batches += 1
+                if self._spool is not None and not resend:
+                    self._unsent.extend(batch)
+            return False
+        return True
 
     def _send_usage(self, usage: UsageData) -> UsageResponse:
         """Send usage data to API."""
+        data = self._post("/api/usage", self._encode(usage), uuid.uuid4().hex)
+        return UsageResponse.from_dict(data)
+
+    def _send_batch(self, usages: List[UsageData]) -> List[UsageResponse]:
+        """Send several usage records to API in one request."""
+        return self._send_encoded_batch([self._encode(u) for u in usages])
+
+    def _send_encoded_batch(
+        self, records: List[bytes], idempotency_key: Optional[str] = None
+    ) -> List[UsageResponse]:
+        """Send already encoded usage records to API in one request."""
+        data = self._post(
+            "/api/usage/batch",
+            self._batch_content(records),
+            idempotency_key or uuid.uuid4().hex,
+        )
+        return UsageResponse.from_dict_batch(data.get("results", []))
+
+    def _post(self, path: str, content: bytes, idempotency_key: str) -> Dict[str, Any]:
+        """POST a JSON request body and return the decoded response body.
+
+        Network errors and server errors are retried with exponential backoff.
+        Every attempt carries the same idempotency key, so the server can
+        discard duplicates of a request that did arrive.
+        """
+        headers = {"Idempotency-Key": idempotency_key}
+        attempt = 0
+        while True:
+            try:
+                response = self._client.post(path, content=content, headers=headers)
+                if response.status_code < 500 or not self._should_retry(attempt):
+                    return self._parse_response(response)
+            except httpx.TransportError as e:
+                if not self._should_retry(attempt):
+                    raise TokenTallyError(f"Request failed: {e}") from e
+            except httpx.HTTPError as e:
+                raise TokenTallyError(f"Request failed: {e}") from e
+
+            time.sleep(self._retry_delay(attempt))
+            attempt += 1
+
+
+@mypyc_attr(allow_interpreted_subclasses=True)
+class BufferedTokenTally(TokenTally):
+    """TokenTally client that buffers usage and sends it in batches.
+
+    Tracked usage is held in memory and submitted with a single request once
+    ``max_batch`` records have accumulated, or ``flush_interval`` seconds after
+    the first buffered record, whichever comes first. Anything still buffered
+    is flushed when the interpreter exits.
+
+    Since sending is deferred, ``track()`` and ``track_usage()`` return a
+    response with an empty record ID and a locally estimated cost; use
+    ``flush()`` to send immediately.
+
+    If a flush fails, the records stay buffered and only the timer retries,
+    backing off from ``flush_interval`` up to five minutes. Once
+    ``max_buffer_size`` records are waiting, new records are dropped and
+    counted in ``dropped_count``.
+
+    Example:
+        >>> from tokentally import BufferedTokenTally
+        >>> tt = BufferedTokenTally(api_key="your_api_key", max_batch=50)
+        >>>
+        >>> for item in work:
+        ...     tt.track(tokens_in=100, tokens_out=200, model="claude-3-haiku")
+        >>>
+        >>> tt.flush()
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_batch: int = 100,
+        flush_interval: float = 5.0,
+        max_buffer_size: int = 10_000,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool = False,
+        max_retries: int = 2,
+        sample_rate: float = 1.0,
+    ):
+        """Initialize buffered TokenTally client.
+
+        Args:
+            api_key: Your TokenTally API key (starts with 'tt_').
+            base_url: Optional custom API base URL.
+            timeout: Request timeout in seconds.
+            max_batch: Number of buffered records that triggers a flush.
+            flush_interval: Maximum seconds a record stays buffered.
+            max_buffer_size: Maximum number of records held while sending
+                fails; further records are dropped.
+            max_connections: Maximum number of concurrent connections.
+            max_keepalive_connections: Maximum number of idle connections kept open.
+            http2: Use HTTP/2. Requires the 'http2' extra to be installed.
+            max_retries: Times to retry a request after a network or server error.
+            sample_rate: Fraction of tracked records to send, from 0 to 1.
+        """
+        if max_buffer_size < max_batch:
+            raise ValueError("max_buffer_size must be at least max_batch")
+
+        super().__init__(
+            api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            http2=http2,
+            max_retries=max_retries,
+            sample_rate=sample_rate,
+            max_batch=max_batch,
+        )
+
+        self.flush_interval = flush_interval
+        self.max_buffer_size = max_buffer_size
+
+        self._buffer: List[bytes] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        # Flushes failed in a row; while nonzero, only the timer flushes.
+        self._flush_failures = 0
+
+        self._register_flush_at_exit(None)
+
+    def close(self) -> None:
+        """Send any buffered usage and close the underlying HTTP client.
+
+        A failed send is logged rather than raised, so leaving a ``with``
+        block never replaces the exception that ended it.
+        """
+        with self._lock:
+            self._closed = True
         try:
-            response = self._client.post("/api/usage", json=usage.to_dict())
+            super().close()
+        except Exception:
+            logger.exception("Failed to flush buffered TokenTally usage on close")
 
-            if response.status_code == 401:
-                raise AuthenticationError("Invalid API key")
-            if response.status_code == 429:
-                data = response.json()
-                raise RateLimitError(data.get("error", "Rate limit exceeded"))
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send all buffered usage now.
 
-            response.raise_for_status()
-            return UsageResponse.from_dict(response.json())
+        If sending fails, the records go back into the buffer and the timer
+        retries them with backoff.
 
-        except httpx.HTTPError as e:
-            raise TokenTallyError(f"Request failed: {e}") from e
+        Args:
+            timeout: Unused; buffered usage is sent synchronously.
+
+        Returns:
+            True once everything buffered has been sent.
+
+        Raises:
+            RateLimitError: If rate limit is exceeded.
+            AuthenticationError: If API key is invalid.
+            TokenTallyError: For other errors.
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if batch:
+            try:
+                self._send_encoded_batch(batch)
+            except Exception:
+                with self._lock:
+                    self._buffer[:0] = batch
+                    # Records tracked while the batch was in flight may not fit.
+                    overflow = len(self._buffer) - self.max_buffer_size
+                    if overflow > 0:
+                        del self._buffer[self.max_buffer_size :]
+                        self.dropped_count += overflow
+                    self._flush_failures += 1
+                    self._schedule_flush()
+                raise
+
+        with self._lock:
+            self._flush_failures = 0
+        return True
+
+    def _dispatch(self, usage: UsageData) -> UsageResponse:
+        """Buffer usage data, flushing once the batch is full."""
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer_size:
+                self.dropped_count += 1
+                dropped = True
+            else:
+                self._buffer.append(self._encode(usage))
+                dropped = False
+            # After a failed flush the timer retries; don't also send from here.
+            flush_now = len(self._buffer) >= self.max_batch and not self._flush_failures
+            if not flush_now:
+                self._schedule_flush()
+
+        if dropped:
+            logger.warning("TokenTally buffer is full; dropping usage record")
+            return self._estimated_response(usage, success=False)
+
+        # A failed send is logged; it is not this record's caller's error.
+        if flush_now:
+            self._flush()
+        return self._estimated_response(usage)
+
+    def _schedule_flush(self) -> None:
+        """Start the flush timer if it is not running. Call with the lock held.
+
+        After failed flushes the interval doubles with each failure, up to
+        ``_MAX_FLUSH_RETRY_INTERVAL``.
+        """
+        if self._timer is None and not self._closed:
+            interval = self.flush_interval
+            if self._flush_failures:
+                backoff = interval * 2 ** min(self._flush_failures, 16)
+                interval = max(interval, min(backoff, _MAX_FLUSH_RETRY_INTERVAL))
+            self._timer = threading.Timer(interval, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self) -> None:
+        """Flush in the background, logging rather than raising."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered TokenTally usage")
+
+
+def _flush_at_exit(ref: Callable[[], Optional[TokenTally]], timeout: Optional[float]) -> None:
+    """atexit hook flushing a client if it is still alive."""
+    client = ref()
+    if client is None:
+        return
+    try:
+        client.flush(timeout)
+    except Exception:
+        logger.exception("Failed to flush TokenTally usage at exit")
+
+
+_default_clients: Dict[str, TokenTally] = {}
+_default_clients_lock = threading.Lock()
+
+
+def get_default_client(api_key: Optional[str] = None) -> TokenTally:
+    """Return a shared TokenTally client for an API key.
+
+    The client is created on first use and reused afterwards, so request
+    handlers can call this instead of building a new client (and connection
+    pool) every time.
+
+    Args:
+        api_key: Your TokenTally API key. Defaults to the TOKENTALLY_API_KEY
+            environment variable.
+
+    Returns:
+        The shared TokenTally client for that key.
+    """
+    api_key = api_key or os.environ.get("TOKENTALLY_API_KEY")
+    if not api_key:
+        raise ValueError("No API key given and TOKENTALLY_API_KEY is not set")
+
+    client = _default_clients.get(api_key)
+    if client is None:
+        with _default_clients_lock:
+            client = _default_clients.get(api_key)
+            if client is None:
+                client = _default_clients[api_key] = TokenTally(api_key)
+    return client
 
 
 class UsageContext:
@@ -223,7 +1002,7 @@ class UsageContext:
 
     def __init__(
         self,
-        client: TokenTally,
+        client: _BaseTokenTally,
         model: str,
         provider: str,
         metadata: Dict[str, Any],
@@ -275,9 +1054,13 @@ class UsageContext:
         """Get the usage response after context exits."""
         return self._response
 
-    def _send(self) -> None:
-        """Send usage data to API."""
-        usage = UsageData(
+    def _has_usage(self) -> bool:
+        """Whether usage was set, i.e. whether there is anything to send."""
+        return self.tokens_in is not None or self.tokens_out is not None or self.credits is not None
+
+    def _to_usage_data(self) -> UsageData:
+        """Build the UsageData to send for this context."""
+        return UsageData(
             tokens_in=self.tokens_in or 0,
             tokens_out=self.tokens_out or 0,
             model=self.model,
@@ -289,7 +1072,5 @@ class UsageContext:
             stop_reason=self.stop_reason,
             error_message=self.error_message,
             metadata=self.metadata,
-            timestamp=datetime.now(timezone.utc),
+            timestamp=utcnow_iso(),
         )
-
-        self._response = self._client._send_usage(usage)
@@ -0,0 +1,88 @@
+"""Local price table for estimating usage cost without a network round trip."""
+
+import threading
+from typing import Dict, Mapping, Optional, Tuple
+
+from tokentally.types import UsageData
+
+# USD per token as (input, output), keyed by model name or model family prefix.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    # Anthropic
+    "claude-3-opus": (15e-6, 75e-6),
+    "claude-3-sonnet": (3e-6, 15e-6),
+    "claude-3-haiku": (0.25e-6, 1.25e-6),
+    "claude-3-5-sonnet": (3e-6, 15e-6),
+    "claude-3-5-haiku": (0.8e-6, 4e-6),
+    "claude-3-7-sonnet": (3e-6, 15e-6),
+    "claude-sonnet-4": (3e-6, 15e-6),
+    "claude-opus-4": (15e-6, 75e-6),
+    # OpenAI
+    "gpt-4o": (2.5e-6, 10e-6),
+    "gpt-4o-mini": (0.15e-6, 0.6e-6),
+    "gpt-4-turbo": (10e-6, 30e-6),
+    "gpt-4": (30e-6, 60e-6),
+    "gpt-3.5-turbo": (0.5e-6, 1.5e-6),
+}
+
+# Resolved price per exact model name, cleared whenever the table changes
+# or grows past _MAX_RESOLVED names.
+_resolved: Dict[str, Optional[Tuple[float, float]]] = {}
+_MAX_RESOLVED = 1024
+_lock = threading.Lock()
+
+
+def get_price(model: str) -> Optional[Tuple[float, float]]:
+    """Look up the (input, output) USD per-token price for a model.
+
+    Exact names take precedence; otherwise the longest table entry that the
+    model name starts with, followed by '-', is used. Dated releases such as
+    'claude-3-sonnet-20240229' match their family, while 'gpt-4.1' does not
+    match 'gpt-4'.
+
+    Args:
+        model: The model name.
+
+    Returns:
+        The price pair, or None if the model is not in the table.
+    """
+    try:
+        return _resolved[model]
+    except KeyError:
+        pass
+
+    with _lock:
+        price = MODEL_PRICES.get(model)
+        if price is None:
+            matches = [name for name in MODEL_PRICES if model.startswith(name + "-")]
+            if matches:
+                price = MODEL_PRICES[max(matches, key=len)]
+        if len(_resolved) >= _MAX_RESOLVED:
+            _resolved.clear()
+        _resolved[model] = price
+    return price
+
+
+def estimate_cost(usage: UsageData) -> Optional[float]:
+    """Estimate the USD cost of a usage record from the local price table.
+
+    Args:
+        usage: The usage to price.
+
+    Returns:
+        The estimated cost, or None if the model is not in the table.
+    """
+    price = get_price(usage.model)
+    if price is None:
+        return None
+    return usage.tokens_in * price[0] + usage.tokens_out * price[1]
+
+
+def update_prices(prices: Mapping[str, Tuple[float, float]]) -> None:
+    """Add or replace entries in the local price table.
+
+    Args:
+        prices: Mapping of model name to (input, output) USD per-token price.
+    """
+    with _lock:
+        MODEL_PRICES.update(prices)
+        _resolved.clear()
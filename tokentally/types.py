@@ -1,26 +1,106 @@
 """Type definitions for TokenTally SDK."""
 
-from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+import sys
+from dataclasses import dataclass
+from typing import Optional, ClassVar, Dict, Any, List, Tuple, Union
 from datetime import datetime
 
+# Slotted dataclasses skip the per-instance __dict__; only supported on 3.10+.
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass
 class UsageData:
-    """Data for tracking AI API usage."""
-
-    tokens_in: int
-    tokens_out: int
-    model: str
-    provider: str = "anthropic"
-    credits: Optional[int] = None
-    resolution: Optional[str] = None
-    quality: Optional[str] = None
-    runtime_ms: Optional[int] = None
-    stop_reason: Optional[str] = None
-    error_message: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    timestamp: Optional[datetime] = None
+    """Data for tracking AI API usage.
+
+    A plain slotted class rather than a dataclass: one is built for every
+    tracked event, and the hand-written constructor is cheaper.
+
+    Records built without metadata don't allocate a dict for it until
+    ``metadata`` is first read.
+    """
+
+    # Field names in constructor order, for __repr__ and __eq__.
+    _FIELDS: ClassVar[Tuple[str, ...]] = (
+        "tokens_in",
+        "tokens_out",
+        "model",
+        "provider",
+        "credits",
+        "resolution",
+        "quality",
+        "runtime_ms",
+        "stop_reason",
+        "error_message",
+        "metadata",
+        "timestamp",
+    )
+
+    # As _FIELDS, but metadata is held in _metadata behind a property.
+    __slots__ = (
+        "tokens_in",
+        "tokens_out",
+        "model",
+        "provider",
+        "credits",
+        "resolution",
+        "quality",
+        "runtime_ms",
+        "stop_reason",
+        "error_message",
+        "_metadata",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        tokens_in: int,
+        tokens_out: int,
+        model: str,
+        provider: str = "anthropic",
+        credits: Optional[int] = None,
+        resolution: Optional[str] = None,
+        quality: Optional[str] = None,
+        runtime_ms: Optional[int] = None,
+        stop_reason: Optional[str] = None,
+        error_message: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[Union[datetime, str]] = None,
+    ):
+        self.tokens_in = tokens_in
+        self.tokens_out = tokens_out
+        self.model = model
+        self.provider = provider
+        self.credits = credits
+        self.resolution = resolution
+        self.quality = quality
+        self.runtime_ms = runtime_ms
+        self.stop_reason = stop_reason
+        self.error_message = error_message
+        self._metadata: Optional[Dict[str, Any]] = metadata
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
+
+    # Mutable, so unhashable. Annotated because mypyc needs the member's type.
+    __hash__: ClassVar[None] = None  # type: ignore[assignment]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Custom metadata for the record."""
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._metadata = value
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API request."""
@@ -29,9 +109,12 @@ class UsageData:
             "tokens_out": self.tokens_out,
             "model": self.model,
             "provider": self.provider,
-            "metadata": self.metadata,
         }
 
+        # A missing metadata key is read as empty by the API.
+        if self._metadata:
+            data["metadata"] = self._metadata
+
         if self.credits is not None:
             data["credits"] = self.credits
         if self.resolution is not None:
@@ -46,12 +129,13 @@ class UsageData:
         if self.error_message is not None:
             data["error_message"] = self.error_message
         if self.timestamp is not None:
-            data["timestamp"] = self.timestamp.isoformat()
+            timestamp = self.timestamp
+            data["timestamp"] = timestamp if isinstance(timestamp, str) else timestamp.isoformat()
 
         return data
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class UsageResponse:
     """Response from recording usage."""
 
@@ -62,8 +146,17 @@ class UsageResponse:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "UsageResponse":
         """Create from API response dictionary."""
-        return cls(
-            success=data.get("success", False),
-            record_id=data.get("record_id", ""),
-            cost_usd=data.get("cost_usd", 0.0),
-        )
+        try:
+            return cls(data["success"], data["record_id"], data["cost_usd"])
+        except KeyError:
+            return cls(
+                success=data.get("success", False),
+                record_id=data.get("record_id", ""),
+                cost_usd=data.get("cost_usd", 0.0),
+            )
+
+    @classmethod
+    def from_dict_batch(cls, items: List[Dict[str, Any]]) -> List["UsageResponse"]:
+        """Create one response per API response dictionary, in order."""
+        from_dict = cls.from_dict
+        return [from_dict(data) for data in items]